@@ -176,3 +176,7 @@ class PrivacyFilter:
         """Clear session data"""
         if session_id in self.sessions:
             del self.sessions[session_id]
+
+    def clear_all_sessions(self):
+        """Clear data for every session, keeping the loaded models"""
+        self.sessions.clear()
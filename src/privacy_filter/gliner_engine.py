@@ -9,6 +9,7 @@ from typing import Dict, List
 from gliner import GLiNER
 
 from .patterns import compile_all_patterns
+from .prefilter import PatternPrefilter
 
 
 class GLiNERPresidioEngine:
@@ -35,6 +36,9 @@ class GLiNERPresidioEngine:
         # Compile regex patterns
         self.compiled_patterns = compile_all_patterns()
 
+        # Hyperscan prefilter (falls back to running every pattern)
+        self.prefilter = PatternPrefilter(self.compiled_patterns)
+
     def analyze(self, text: str, language: str = "en") -> List[Dict]:
         """
         Analyze text using GLiNER + regex fallback
@@ -114,18 +118,18 @@ class GLiNERPresidioEngine:
         """
         entities = []
 
-        # Apply all compiled patterns
-        for entity_type, patterns in self.compiled_patterns.items():
-            for pattern, pattern_name in patterns:
-                for match in pattern.finditer(text):
-                    entities.append({
-                        "entity_type": entity_type,
-                        "start": match.start(),
-                        "end": match.end(),
-                        "score": 0.95,  # High confidence for regex
-                        "text": match.group(),
-                        "pattern": pattern_name
-                    })
+        # Apply only the compiled patterns the prefilter could not rule out
+        for pattern_id in self.prefilter.candidates(text):
+            entity_type, pattern, pattern_name = self.prefilter.patterns[pattern_id]
+            for match in pattern.finditer(text):
+                entities.append({
+                    "entity_type": entity_type,
+                    "start": match.start(),
+                    "end": match.end(),
+                    "score": 0.95,  # High confidence for regex
+                    "text": match.group(),
+                    "pattern": pattern_name
+                })
 
         return entities
 
@@ -17,8 +17,29 @@ from nats.js.api import KeyValueConfig
 from nats.js.errors import KeyNotFoundError
 from nats.js.kv import KeyValue
 
+# Optional fast JSON codec (C implementation, emits bytes directly)
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
 
+
+def _json_dumps(data) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+
+def _json_loads(data: bytes):
+    """Deserialize JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode())
+
+
 # ============================================================================
 # KDF Encryption with Automatic 24-Hour Rotation
 # ============================================================================
@@ -338,7 +359,7 @@ class NATSSessionStore:
             raise RuntimeError(_NATS_NOT_CONNECTED_ERROR)
 
         key = f"session:{session_id}"
-        value = json.dumps(token_map).encode()
+        value = _json_dumps(token_map)
 
         # Encrypt if enabled
         if self._encryption.is_enabled:
@@ -391,7 +412,7 @@ class NATSSessionStore:
                     logger.error(f"Decryption failed for session {session_id}: {e}")
                     return None
 
-            token_map = json.loads(value.decode())
+            token_map = _json_loads(value)
             logger.debug(f"Retrieved session {session_id}")
             return token_map
         except KeyNotFoundError:
@@ -459,6 +480,20 @@ class NATSSessionStore:
         except KeyNotFoundError:
             return False
 
+    async def purge_all_sessions(self) -> None:
+        """
+        Delete every session in the bucket in one operation.
+
+        Purges the KV bucket's backing stream instead of deleting
+        keys one by one.
+        """
+        if not self._js:
+            raise RuntimeError(_NATS_NOT_CONNECTED_ERROR)
+
+        await self._js.purge_stream(f"KV_{self.bucket_name}")
+        await self._publish_event("purge", {"bucket": self.bucket_name})
+        logger.info(f"Purged all sessions in bucket {self.bucket_name}")
+
     async def extend_session(
         self,
         session_id: str,
@@ -494,7 +529,7 @@ class NATSSessionStore:
             return
 
         subject = f"privacy.events.{event_type}"
-        payload = json.dumps(data).encode()
+        payload = _json_dumps(data)
 
         try:
             await self._nc.publish(subject, payload)
@@ -0,0 +1,145 @@
+"""
+Hyperscan prefilter for regex PII detection
+Single SIMD scan selects which patterns need a full re.finditer pass
+"""
+
+import re
+from typing import Dict, List, Sequence, Tuple
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    hyperscan = None  # type: ignore[assignment]
+    HYPERSCAN_AVAILABLE = False
+
+# re's \s also matches the ASCII information separators; Hyperscan's does not
+_RE_ONLY_SPACES = re.compile("[\x1c-\x1f]")
+
+
+class PatternPrefilter:
+    """
+    Hyperscan database over all compiled PII patterns
+
+    Hyperscan reports match positions with different semantics than
+    re.finditer (every match end, no leftmost-greedy overlap rules), so it
+    is used only to decide which patterns can match. Patterns that hit are
+    then run through Python's re to keep entity output identical.
+
+    Without hyperscan installed every pattern is a candidate.
+    """
+
+    def __init__(self, compiled_patterns: Dict[str, List[Tuple[re.Pattern, str]]]):
+        """
+        Build the prefilter database
+
+        Args:
+            compiled_patterns: Output of patterns.compile_all_patterns()
+        """
+        self.patterns: List[Tuple[str, re.Pattern, str]] = [
+            (entity_type, pattern, pattern_name)
+            for entity_type, patterns in compiled_patterns.items()
+            for pattern, pattern_name in patterns
+        ]
+        self._all_ids = tuple(range(len(self.patterns)))
+
+        # Patterns Hyperscan cannot compile are always run through re
+        self._always_run: Tuple[int, ...] = self._all_ids
+        self._db = None
+
+        # re's IGNORECASE matches some non-ASCII letters against ASCII ones
+        # (İ and ı against i) where Hyperscan's caseless mode does not, so
+        # these patterns are also run whenever the text is not ASCII
+        self._caseless_ids: Tuple[int, ...] = tuple(
+            pattern_id
+            for pattern_id, (_, pattern, _) in enumerate(self.patterns)
+            if pattern.flags & re.IGNORECASE
+        )
+
+        if HYPERSCAN_AVAILABLE:
+            self._db, self._always_run = self._build_db()
+
+    @staticmethod
+    def _hs_flags(pattern: re.Pattern) -> int:
+        """Translate re flags to Hyperscan prefilter flags"""
+        flags = (
+            hyperscan.HS_FLAG_PREFILTER
+            | hyperscan.HS_FLAG_SINGLEMATCH
+            | hyperscan.HS_FLAG_UTF8
+            | hyperscan.HS_FLAG_UCP
+        )
+        if pattern.flags & re.IGNORECASE:
+            flags |= hyperscan.HS_FLAG_CASELESS
+        return flags
+
+    def _build_db(self):
+        """
+        Compile every supported pattern into one block-mode database
+
+        Returns:
+            Tuple of (database or None, ids of patterns to always run)
+        """
+        expressions: List[bytes] = []
+        ids: List[int] = []
+        flags: List[int] = []
+        always_run: List[int] = []
+
+        for pattern_id, (_, pattern, _) in enumerate(self.patterns):
+            expression = pattern.pattern.encode("utf-8")
+            pattern_flags = self._hs_flags(pattern)
+
+            # Compile individually first so one unsupported construct
+            # (lookbehind, \u escapes) does not disable the whole database
+            try:
+                hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK).compile(
+                    expressions=[expression], ids=[pattern_id], flags=[pattern_flags]
+                )
+            except hyperscan.error:
+                always_run.append(pattern_id)
+                continue
+
+            expressions.append(expression)
+            ids.append(pattern_id)
+            flags.append(pattern_flags)
+
+        if not expressions:
+            return None, self._all_ids
+
+        db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        db.compile(expressions=expressions, ids=ids, flags=flags)
+
+        return db, tuple(always_run)
+
+    def candidates(self, text: str) -> Sequence[int]:
+        """
+        Get ids of patterns that may match text
+
+        Args:
+            text: Input text
+
+        Returns:
+            Pattern ids in original pattern order
+        """
+        if self._db is None:
+            return self._all_ids
+
+        try:
+            data = text.encode("utf-8")
+        except UnicodeEncodeError:
+            # Lone surrogates are not valid UTF-8 input for Hyperscan
+            return self._all_ids
+
+        if _RE_ONLY_SPACES.search(text):
+            return self._all_ids
+
+        matched = set(self._always_run)
+
+        def on_match(pattern_id, start, end, flags, context):
+            matched.add(pattern_id)
+
+        self._db.scan(data, match_event_handler=on_match)
+
+        if not text.isascii():
+            matched.update(self._caseless_ids)
+
+        return sorted(matched)
@@ -2,25 +2,62 @@
 Pytest configuration and shared fixtures
 """
 
-import pytest
-import sys
-from pathlib import Path
+from functools import lru_cache
+from types import MappingProxyType
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import pytest
 
-from privacy_filter import PrivacyFilter
+# src/ is on sys.path via [tool.pytest.ini_options] pythonpath
+from privacy_filter import MaskingResult, PrivacyFilter
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def filter_instance():
-    """Create a shared PrivacyFilter instance for all tests"""
+    """Create a shared PrivacyFilter instance for all tests (GLiNER loads once)"""
     return PrivacyFilter(use_gliner=True)
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(autouse=True)
+def _clear_filter_sessions(request):
+    """Drop masking sessions between tests instead of rebuilding the filter"""
+    if "filter_instance" not in request.fixturenames:
+        yield
+        return
+
+    filter_instance = request.getfixturevalue("filter_instance")
+    yield
+    filter_instance.clear_all_sessions()
+
+
+@pytest.fixture(scope="session")
+def mask_cached(filter_instance):
+    """
+    Memoized filter_instance.mask for detection-only assertions
+
+    Identical texts are analyzed once per session. Results are shared
+    between tests, so they are returned read-only; do not demask through
+    their session_id since sessions are cleared after every test.
+    """
+    @lru_cache(maxsize=4096)
+    def _mask(text, entities=None):
+        if entities:
+            result = filter_instance.mask(text, entities_to_mask=list(entities))
+        else:
+            result = filter_instance.mask(text)
+
+        return MaskingResult(
+            masked_text=result.masked_text,
+            token_map=MappingProxyType(result.token_map),
+            entities_found=tuple(MappingProxyType(e) for e in result.entities_found),
+            session_id=result.session_id,
+        )
+
+    return _mask
+
+
+@pytest.fixture(scope="session")
 def filter_no_gliner():
-    """Create PrivacyFilter without GLiNER (regex only)"""
+    """Create PrivacyFilter without GLiNER (Presidio only), shared by all tests"""
     return PrivacyFilter(use_gliner=False)
 
 
@@ -0,0 +1,145 @@
+"""
+Batched masking helpers
+
+Joins the cases of a parametrized sweep into a few newline-joined
+documents so the sweep pays for a handful of mask() calls instead of one
+per case.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from privacy_filter import MaskingResult
+
+# GLiNER splits input into words with this pattern and drops everything
+# past max_len words (384 for gliner_medium-v2.1). Its DeBERTa encoder
+# also truncates at 512 subword tokens, entity labels included, and
+# base58/hex addresses split into a subword every two or three characters.
+# Chunks are capped on both words and characters so every case is seen by
+# the model, not just the regexes.
+_WORD_RE = re.compile(r"\w+(?:[-_]\w+)*|\S")
+MAX_CHUNK_WORDS = 128
+MAX_CHUNK_CHARS = 512
+
+
+@dataclass
+class BatchMaskResult:
+    """Result of masking many test cases as newline-joined chunks"""
+    values: Sequence[str]
+    lines: List[str]
+    spans: List[Tuple[int, int]]  # (start, end) of each value in its chunk's text
+    chunk_of: List[int]  # chunk holding each case
+    line_in_chunk: List[int]  # line number of each case within its chunk
+    results: List[MaskingResult]  # one per chunk
+    _masked_line_lists: List[List[str]] = field(init=False, repr=False)
+    _chunk_sizes: List[int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._masked_line_lists = [r.masked_text.split("\n") for r in self.results]
+        self._chunk_sizes = [0] * len(self.results)
+        for chunk in self.chunk_of:
+            self._chunk_sizes[chunk] += 1
+
+    def result_at(self, index: int) -> MaskingResult:
+        """Get the mask() result of the chunk holding case number index"""
+        return self.results[self.chunk_of[index]]
+
+    def entities_at(self, index: int) -> List[Dict]:
+        """Get entities overlapping the value of case number index"""
+        start, end = self.spans[index]
+        return [
+            e for e in self.result_at(index).entities_found
+            if e["start"] < end and e["end"] > start
+        ]
+
+    def leaks_at(self, index: int) -> bool:
+        """
+        Check whether the value of case number index survived masking
+
+        Searches only the case's own masked line. If an entity spanned a
+        line break the lines no longer align, so the whole chunk is searched.
+        """
+        value = self.values[index]
+        chunk = self.chunk_of[index]
+        masked_lines = self._masked_line_lists[chunk]
+        if len(masked_lines) != self._chunk_sizes[chunk]:
+            return value in self.results[chunk].masked_text
+        return value in masked_lines[self.line_in_chunk[index]]
+
+
+def mask_batch(filter_instance, template: str, values: Sequence[str]) -> BatchMaskResult:
+    """
+    Mask all values in as few calls as the model window allows
+
+    Args:
+        filter_instance: PrivacyFilter to mask with
+        template: Line template with a single "{}" placeholder
+        values: Test cases to substitute into the template
+
+    Returns:
+        BatchMaskResult with per-value spans into each chunk
+    """
+    return mask_batch_templated(filter_instance, [(template, value) for value in values])
+
+
+def mask_batch_templated(
+    filter_instance,
+    cases: Sequence[Tuple[str, str]],
+) -> BatchMaskResult:
+    """
+    Mask values that each use their own line template, chunked to fit GLiNER
+
+    Args:
+        filter_instance: PrivacyFilter to mask with
+        cases: (template, value) pairs; templates hold a single "{}" placeholder
+
+    Returns:
+        BatchMaskResult with per-value spans into each chunk
+    """
+    values = []
+    lines = []
+    spans = []
+    chunk_of = []
+    line_in_chunk = []
+    chunks: List[List[str]] = []
+    chunk_words = 0
+    chunk_chars = 0
+    offset = 0
+    for template, value in cases:
+        prefix, _ = template.split("{}")
+        line = template.format(value)
+        words = len(_WORD_RE.findall(line))
+
+        # Start a new chunk when this line would overflow the current one
+        if (
+            not chunks
+            or chunk_words + words > MAX_CHUNK_WORDS
+            or chunk_chars + len(line) > MAX_CHUNK_CHARS
+        ):
+            chunks.append([])
+            chunk_words = 0
+            chunk_chars = 0
+            offset = 0
+
+        start = offset + len(prefix)
+        values.append(value)
+        lines.append(line)
+        spans.append((start, start + len(value)))
+        chunk_of.append(len(chunks) - 1)
+        line_in_chunk.append(len(chunks[-1]))
+        chunks[-1].append(line)
+        chunk_words += words
+        chunk_chars += len(line) + 1
+        offset += len(line) + 1  # newline separator
+
+    results = [filter_instance.mask("\n".join(chunk)) for chunk in chunks]
+
+    return BatchMaskResult(
+        values=values,
+        lines=lines,
+        spans=spans,
+        chunk_of=chunk_of,
+        line_in_chunk=line_in_chunk,
+        results=results,
+    )
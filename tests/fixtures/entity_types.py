@@ -0,0 +1,12 @@
+"""
+Entity type checks for MaskingResult
+
+Answers "did any entity of type X appear?" for a single mask() result.
+"""
+
+from typing import AbstractSet
+
+
+def has_entity_type(result, accepted: AbstractSet[str]) -> bool:
+    """Check whether result contains an entity of any accepted type"""
+    return not accepted.isdisjoint(e["entity_type"] for e in result.entities_found)
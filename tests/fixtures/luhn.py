@@ -0,0 +1,79 @@
+"""
+Luhn checksum helpers for credit card fixtures
+
+Splits CREDIT_CARD_TEST_CASES into checksum-valid and checksum-invalid
+groups at import time, so card expectations need no detector calls.
+"""
+
+import re
+from functools import lru_cache
+from typing import Tuple
+
+from tests.fixtures.test_data import CREDIT_CARD_TEST_CASES
+
+_NON_DIGITS = re.compile(r"\D")
+
+# Lane sums are folded with "% 255", exact while the digit sum stays
+# below 255 (9 * 28 = 252). Card numbers are at most 19 digits.
+_MAX_SWAR_DIGITS = 28
+
+
+def strip_nondigits(card: str) -> str:
+    """Remove separators (spaces, dashes, dots) from a card number"""
+    return _NON_DIGITS.sub("", card)
+
+
+@lru_cache(maxsize=None)
+def _lane_masks(length: int) -> Tuple[int, int, int]:
+    """
+    Per-length SWAR constants, one byte lane per digit
+
+    Returns:
+        (0x30 in every lane, 0xFF in doubled lanes, 0x01 in doubled lanes)
+    """
+    all_lanes = int.from_bytes(b"\x01" * length, "big")
+    doubled = sum(0x01 << (8 * i) for i in range(1, length, 2))
+    return all_lanes * 0x30, doubled * 0xFF, doubled
+
+
+def luhn_ok(digits: str) -> bool:
+    """
+    Check the Luhn checksum of a digit string without per-digit branches
+
+    Packs the ASCII digits into one integer, a byte lane per digit, and
+    runs the doubling, the "minus 9 above 9" fix-up and the horizontal
+    sum as whole-word arithmetic (SWAR).
+
+    Args:
+        digits: Card number without separators
+
+    Returns:
+        True if the checksum is valid
+    """
+    data = digits.encode("ascii", "ignore")
+    if not data or not data.isdigit() or len(data) != len(digits):
+        return False
+    if len(data) > _MAX_SWAR_DIGITS:
+        return False
+
+    ascii_zero, doubled_mask, doubled_ones = _lane_masks(len(data))
+
+    # Lane i (from the right) holds digit value 0-9
+    lanes = int.from_bytes(data, "big") - ascii_zero
+
+    # Double every second digit from the right; lanes stay <= 18
+    doubled = (lanes & doubled_mask) << 1
+
+    # x + 6 sets bit 4 exactly when x >= 10; subtract 9 from those lanes
+    over_nine = ((doubled + doubled_ones * 6) >> 4) & doubled_ones
+    doubled -= over_nine * 9
+
+    # Horizontal add of all byte lanes: 256 == 1 (mod 255)
+    total = (lanes & ~doubled_mask) + doubled
+    return (total % 255) % 10 == 0
+
+
+VALID_CARDS = frozenset(
+    card for card in CREDIT_CARD_TEST_CASES if luhn_ok(strip_nondigits(card))
+)
+INVALID_CARDS = frozenset(CREDIT_CARD_TEST_CASES) - VALID_CARDS
@@ -88,6 +88,23 @@ def test_session_cleanup(filter_instance):
     assert session_id not in filter_instance.sessions
 
 
+def test_clear_all_sessions(filter_instance):
+    """Test clearing every session at once"""
+    session_ids = [
+        filter_instance.mask(f"Email: user{i}@example.com").session_id
+        for i in range(2)
+    ]
+
+    filter_instance.clear_all_sessions()
+
+    assert all(session_id not in filter_instance.sessions for session_id in session_ids)
+
+
+def test_mask_returns_str_contract(filter_instance):
+    """Test that mask always returns masked text as a string"""
+    assert isinstance(filter_instance.mask("x").masked_text, str)
+
+
 def test_empty_text(filter_instance):
     """Test handling empty text"""
     text = ""
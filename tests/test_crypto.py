@@ -4,33 +4,50 @@ Comprehensive Cryptocurrency Address Detection Tests
 """
 
 import pytest
+from tests.fixtures.batching import mask_batch
+from tests.fixtures.entity_types import has_entity_type
 from tests.fixtures.test_data import CRYPTO_TEST_CASES
 
+# Entity types accepted as a crypto address detection
+BITCOIN_TYPES = frozenset({"BITCOIN_ADDRESS", "CRYPTO_ADDRESS"})
+ETHEREUM_TYPES = frozenset({"ETHEREUM_ADDRESS", "CRYPTO_ADDRESS"})
+CRYPTO_TYPES = BITCOIN_TYPES | ETHEREUM_TYPES
+
+# Bitcoin subset used for the mask -> demask round trip
+CRYPTO_CASES_ROUNDTRIP = CRYPTO_TEST_CASES[:30]
+
+# (case index, address) pairs; the index addresses the case in the batch,
+# so repeated values are each checked on their own line
+CRYPTO_DETECTION_CASES = tuple(enumerate(CRYPTO_TEST_CASES))
+
+
+@pytest.fixture(scope="module")
+def crypto_mask_result(filter_instance):
+    """Mask all crypto address cases in a few batched calls"""
+    return mask_batch(filter_instance, "Send payment to {}", CRYPTO_TEST_CASES)
+
 
 @pytest.mark.crypto
+@pytest.mark.xdist_group("crypto")
 class TestCryptoDetection:
     """Test cryptocurrency address detection across 100 variations"""
 
-    @pytest.mark.parametrize("crypto_address", CRYPTO_TEST_CASES)
-    def test_crypto_detection(self, filter_instance, crypto_address):
+    @pytest.mark.parametrize(
+        "index,crypto_address", CRYPTO_DETECTION_CASES, ids=CRYPTO_TEST_CASES
+    )
+    def test_crypto_detection(self, crypto_mask_result, index, crypto_address):
         """Test that each crypto address format is detected"""
-        text = f"Send payment to {crypto_address}"
-
-        result = filter_instance.mask(text)
-
         # Check if detected
-        crypto_detected = any(
-            "BITCOIN" in entity["entity_type"] or
-            "ETHEREUM" in entity["entity_type"] or
-            "CRYPTO" in entity["entity_type"]
-            for entity in result.entities_found
+        crypto_detected = not CRYPTO_TYPES.isdisjoint(
+            entity["entity_type"] for entity in crypto_mask_result.entities_at(index)
         )
 
         # If detected, should be masked
         if crypto_detected:
-            assert crypto_address not in result.masked_text, f"Crypto not masked: {crypto_address}"
+            assert not crypto_mask_result.leaks_at(index), \
+                f"Crypto not masked: {crypto_address}"
 
-    @pytest.mark.parametrize("crypto_address", CRYPTO_TEST_CASES[:30])  # Test Bitcoin
+    @pytest.mark.parametrize("crypto_address", CRYPTO_CASES_ROUNDTRIP)
     def test_crypto_masking_and_demasking(self, filter_instance, crypto_address):
         """Test full mask -> demask cycle for crypto addresses"""
         text = f"Wallet: {crypto_address}"
@@ -61,8 +78,7 @@ class TestCryptoDetection:
             text = f"BTC: {address}"
             result = filter_instance.mask(text)
 
-            if any("BITCOIN" in e["entity_type"] or "CRYPTO" in e["entity_type"]
-                   for e in result.entities_found):
+            if has_entity_type(result, BITCOIN_TYPES):
                 detected_count += 1
 
         # Should detect Bitcoin addresses
@@ -81,8 +97,7 @@ class TestCryptoDetection:
             text = f"BTC (SegWit): {address}"
             result = filter_instance.mask(text)
 
-            if any("BITCOIN" in e["entity_type"] or "CRYPTO" in e["entity_type"]
-                   for e in result.entities_found):
+            if has_entity_type(result, BITCOIN_TYPES):
                 detected_count += 1
 
         # SegWit addresses are harder to detect
@@ -101,8 +116,7 @@ class TestCryptoDetection:
             text = f"ETH: {address}"
             result = filter_instance.mask(text)
 
-            if any("ETHEREUM" in e["entity_type"] or "CRYPTO" in e["entity_type"]
-                   for e in result.entities_found):
+            if has_entity_type(result, ETHEREUM_TYPES):
                 detected_count += 1
 
         # Should detect Ethereum addresses
@@ -134,9 +148,7 @@ class TestCryptoDetection:
         # Should detect multiple crypto addresses
         crypto_entities = [
             e for e in result.entities_found
-            if "BITCOIN" in e["entity_type"] or
-               "ETHEREUM" in e["entity_type"] or
-               "CRYPTO" in e["entity_type"]
+            if e["entity_type"] in CRYPTO_TYPES
         ]
 
         # At least one should be detected
@@ -0,0 +1,99 @@
+"""
+Tests for the Hyperscan regex prefilter
+Run with: pytest tests/test_prefilter.py -v
+"""
+
+import pytest
+from privacy_filter.patterns import compile_all_patterns
+from privacy_filter.prefilter import PatternPrefilter
+from tests.fixtures.test_data import (
+    CREDIT_CARD_TEST_CASES,
+    CRYPTO_TEST_CASES,
+    EMAIL_TEST_CASES,
+    PHONE_TEST_CASES,
+    SSN_TEST_CASES,
+)
+
+ALL_TEST_CASES = (
+    EMAIL_TEST_CASES
+    + PHONE_TEST_CASES
+    + CREDIT_CARD_TEST_CASES
+    + SSN_TEST_CASES
+    + CRYPTO_TEST_CASES
+)
+
+# Non-ASCII letters re's IGNORECASE matches against ASCII ones; Hyperscan
+# folds ſ and the Kelvin sign itself but misses İ and ı
+NON_ASCII_CASELESS_TEXTS = (
+    "Contact: ALİ@FİRMA.COM today",
+    "Contact: ali@fırma.com today",
+    "Contact: uſer@example.com today",
+    "Contact: user@example.\u212az today",
+    "Contact: ſupport@åland.fı today",
+)
+
+
+# ASCII information separators are whitespace to re's \s but not Hyperscan's
+RE_ONLY_SPACE_TEXTS = (
+    "Call 555\x1c123\x1c4567 now",
+    "Call (555)\x1d123-4567 now",
+    "Card 4111\x1e1111\x1e1111\x1e1111",
+    "Call +44\x1f20\x1f7123\x1f4567 now",
+)
+
+
+def _matching_ids(prefilter, text):
+    """Ids of patterns that re itself matches in text"""
+    return {
+        pattern_id
+        for pattern_id, (_, pattern, _) in enumerate(prefilter.patterns)
+        if pattern.search(text)
+    }
+
+
+@pytest.fixture(scope="module")
+def prefilter():
+    """Build the prefilter once for all tests"""
+    return PatternPrefilter(compile_all_patterns())
+
+
+@pytest.mark.parametrize("value", ALL_TEST_CASES)
+def test_candidates_cover_all_matching_patterns(prefilter, value):
+    """Prefilter must never drop a pattern that re would match"""
+    text = f"Value: {value} end"
+
+    candidates = set(prefilter.candidates(text))
+
+    assert _matching_ids(prefilter, text) <= candidates
+
+
+@pytest.mark.parametrize("text", NON_ASCII_CASELESS_TEXTS)
+def test_candidates_cover_non_ascii_case_folding(prefilter, text):
+    """Caseless patterns stay candidates when re folds non-ASCII letters"""
+    matching = _matching_ids(prefilter, text)
+    candidates = set(prefilter.candidates(text))
+
+    assert matching, f"No pattern matches {text!r}"
+    assert matching <= candidates
+
+
+def test_candidates_preserve_pattern_order(prefilter):
+    """Candidates come back in original pattern order"""
+    candidates = list(prefilter.candidates("Email john@example.com, SSN 123-45-6789"))
+    assert candidates == sorted(candidates)
+
+
+def test_empty_text_has_no_hyperscan_candidates(prefilter):
+    """Text without PII only runs patterns Hyperscan could not compile"""
+    candidates = set(prefilter.candidates(""))
+    assert candidates == set(prefilter._always_run)
+
+
+@pytest.mark.parametrize("text", RE_ONLY_SPACE_TEXTS)
+def test_candidates_cover_re_only_whitespace(prefilter, text):
+    """Patterns stay candidates when re's \\s matches an ASCII separator"""
+    matching = _matching_ids(prefilter, text)
+    candidates = set(prefilter.candidates(text))
+
+    assert matching, f"No pattern matches {text!r}"
+    assert matching <= candidates
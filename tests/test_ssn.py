@@ -4,51 +4,83 @@ Comprehensive SSN and National ID Detection Tests
 """
 
 import pytest
+from tests.fixtures.batching import mask_batch
 from tests.fixtures.test_data import SSN_TEST_CASES
 
+# Entity types accepted as an SSN or national ID detection (GLiNER/regex
+# labels plus Presidio's national ID recognizers)
+ACCEPTED_SSN_TYPES = frozenset({
+    "US_SSN", "SSN", "US_ITIN",
+    "UK_NINO", "UK_NHS",
+    "CA_SIN",
+    "AU_TFN",
+    "IN_AADHAAR", "IN_PAN",
+    "NATIONAL_ID", "GOVERNMENT_ID", "ID_NUMBER",
+})
 
-@pytest.mark.ssn
-class TestSSNDetection:
-    """Test SSN and national ID detection across 100 variations"""
+# Entity types accepted as a US SSN detection
+US_SSN_TYPES = frozenset({"US_SSN", "SSN"})
 
-    @pytest.mark.parametrize("ssn", SSN_TEST_CASES)
-    def test_ssn_detection(self, filter_instance, ssn):
-        """Test that each SSN/ID format is detected"""
-        text = f"ID: {ssn}"
+# Frozen copies of the fixture data shared by parametrize and fixtures;
+# US SSNs are used for the mask -> demask round trip
+SSN_CASES_ALL = tuple(SSN_TEST_CASES)
+SSN_CASES_US = SSN_CASES_ALL[:30]
 
-        result = filter_instance.mask(text)
+# (case index, SSN) pairs built once at collection; the index addresses
+# the case's precomputed span in the batch, including repeated values
+SSN_DETECTION_CASES = tuple(enumerate(SSN_CASES_ALL))
 
-        # Check if detected
-        ssn_detected = any(
-            "SSN" in entity["entity_type"] or
-            "NATIONAL" in entity["entity_type"] or
-            "ID" in entity["entity_type"]
-            for entity in result.entities_found
-        )
 
-        # If detected, should be masked
-        if ssn_detected:
-            assert ssn not in result.masked_text, f"SSN not masked: {ssn}"
+def _ssn_detected_at(batch, index):
+    """Check whether case number index was detected as an SSN/ID"""
+    return any(
+        entity["entity_type"] in ACCEPTED_SSN_TYPES
+        for entity in batch.entities_at(index)
+    )
 
-    @pytest.mark.parametrize("ssn", SSN_TEST_CASES[:30])  # Test US SSNs
-    def test_us_ssn_masking_and_demasking(self, filter_instance, ssn):
-        """Test full mask -> demask cycle for US SSNs"""
-        text = f"Social Security Number: {ssn}"
 
-        # Mask
-        mask_result = filter_instance.mask(text)
-        session_id = mask_result.session_id
+@pytest.fixture(scope="module")
+def ssn_mask_result(filter_instance):
+    """Mask all SSN/ID cases in a few batched calls"""
+    return mask_batch(filter_instance, "ID: {}", SSN_CASES_ALL)
+
+
+@pytest.mark.ssn
+class TestSSNDetection:
+    """
+    Test SSN and national ID detection across 100 variations
+
+    Only the test sharing the batched fixture is pinned to one xdist
+    worker; the independent format tests spread across workers.
+    """
 
-        # Demask
-        demask_result = filter_instance.demask(
-            mask_result.masked_text,
-            session_id=session_id
-        )
+    @pytest.mark.xdist_group("ssn")
+    @pytest.mark.parametrize("index,ssn", SSN_DETECTION_CASES, ids=SSN_CASES_ALL)
+    def test_ssn_detection(self, ssn_mask_result, index, ssn):
+        """Test that each SSN/ID format is detected"""
+        # If detected, should be masked
+        if _ssn_detected_at(ssn_mask_result, index):
+            assert not ssn_mask_result.leaks_at(index), f"SSN not masked: {ssn}"
+
+    def test_us_ssn_masking_and_demasking(self, filter_instance):
+        """Test full mask -> demask cycle for US SSNs in a few batched calls"""
+        batch = mask_batch(filter_instance, "Social Security Number: {}", SSN_CASES_US)
+
+        # Demask each chunk with its own session
+        demask_results = [
+            filter_instance.demask(
+                mask_result.masked_text,
+                session_id=mask_result.session_id
+            )
+            for mask_result in batch.results
+        ]
 
         # Should restore
-        assert demask_result.original_text is not None
+        assert all(r.original_text is not None for r in demask_results)
+        original_text = "\n".join(r.original_text for r in demask_results)
+        assert all(ssn in original_text for ssn in SSN_CASES_US)
 
-    def test_us_ssn_formats(self, filter_instance):
+    def test_us_ssn_formats(self, mask_cached):
         """Test various US SSN formats"""
         us_ssns = [
             "123-45-6789",
@@ -59,15 +91,15 @@ class TestSSNDetection:
         detected_count = 0
         for ssn in us_ssns:
             text = f"SSN: {ssn}"
-            result = filter_instance.mask(text)
+            result = mask_cached(text)
 
-            if any("SSN" in e["entity_type"] for e in result.entities_found):
+            if any(e["entity_type"] in US_SSN_TYPES for e in result.entities_found):
                 detected_count += 1
 
         # Should detect US SSN format
         assert detected_count >= len(us_ssns) // 2
 
-    def test_uk_nino_format(self, filter_instance):
+    def test_uk_nino_format(self, mask_cached):
         """Test UK National Insurance Number"""
         uk_ninos = [
             "AB123456C",
@@ -76,13 +108,10 @@ class TestSSNDetection:
         ]
 
         for nino in uk_ninos:
-            text = f"NINO: {nino}"
-            result = filter_instance.mask(text)
+            # May or may not detect UK format; should not crash
+            mask_cached(f"NINO: {nino}")
 
-            # May or may not detect UK format
-            assert result.masked_text is not None
-
-    def test_canadian_sin_format(self, filter_instance):
+    def test_canadian_sin_format(self, mask_cached):
         """Test Canadian Social Insurance Number"""
         canadian_sins = [
             "123-456-789",
@@ -91,13 +120,10 @@ class TestSSNDetection:
         ]
 
         for sin in canadian_sins:
-            text = f"SIN: {sin}"
-            result = filter_instance.mask(text)
-
-            # May detect as SSN or similar
-            assert result.masked_text is not None
+            # May detect as SSN or similar; should not crash
+            mask_cached(f"SIN: {sin}")
 
-    def test_australian_tfn_format(self, filter_instance):
+    def test_australian_tfn_format(self, mask_cached):
         """Test Australian Tax File Number"""
         australian_tfns = [
             "123-456-789",
@@ -106,12 +132,9 @@ class TestSSNDetection:
         ]
 
         for tfn in australian_tfns:
-            text = f"TFN: {tfn}"
-            result = filter_instance.mask(text)
+            mask_cached(f"TFN: {tfn}")
 
-            assert result.masked_text is not None
-
-    def test_indian_aadhaar_format(self, filter_instance):
+    def test_indian_aadhaar_format(self, mask_cached):
         """Test Indian Aadhaar number"""
         aadhaar_numbers = [
             "1234-5678-9012",
@@ -120,12 +143,9 @@ class TestSSNDetection:
         ]
 
         for aadhaar in aadhaar_numbers:
-            text = f"Aadhaar: {aadhaar}"
-            result = filter_instance.mask(text)
-
-            assert result.masked_text is not None
+            mask_cached(f"Aadhaar: {aadhaar}")
 
-    def test_multiple_national_ids(self, filter_instance):
+    def test_multiple_national_ids(self, mask_cached):
         """Test multiple national IDs from different countries"""
         text = """
         US SSN: 123-45-6789
@@ -133,12 +153,12 @@ class TestSSNDetection:
         Canadian SIN: 987-654-321
         """
 
-        result = filter_instance.mask(text)
+        result = mask_cached(text)
 
         # Should detect at least some IDs
-        assert len(result.entities_found) >= 1
+        assert result.entities_found
 
-    def test_ssn_in_sentence(self, filter_instance):
+    def test_ssn_in_sentence(self, mask_cached):
         """Test SSNs embedded in natural text"""
         test_cases = [
             "My Social Security Number is 123-45-6789",
@@ -148,8 +168,8 @@ class TestSSNDetection:
 
         detected_count = 0
         for text in test_cases:
-            result = filter_instance.mask(text)
-            if len(result.entities_found) > 0:
+            result = mask_cached(text)
+            if result.entities_found:
                 detected_count += 1
 
         # Should detect SSNs in sentences